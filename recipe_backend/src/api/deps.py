@@ -1,26 +1,80 @@
-from typing import Optional
+import hashlib
+import time
+from threading import Lock
+from typing import Any, Callable, Optional, Type, TypeVar
 
-from fastapi import Depends, HTTPException, status
+import orjson
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer
+from pydantic import BaseModel, ValidationError
 from sqlalchemy.orm import Session
 
-from src.core.security import decode_access_token
+from src.core.security import decode_access_token_claims
 from src.db import get_db
 from src.db.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Verified token subjects keyed by a sha256 prefix of the raw bearer token.
+# Each entry also carries the token's own `exp` so a cached subject never outlives the token.
+_jwt_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_jwt_cache_lock = Lock()
+
+# Detached, read-only User snapshots keyed by id so authenticated requests skip the user SELECT.
+# Route code only reads column attributes (id, email, is_active, ...) from these instances; a handler
+# that needs a session-bound user must re-attach it with `db.merge(user, load=False)`. Nothing in the API
+# modifies users after registration; the TTL bounds how long an out-of-band change can go unseen.
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=60)
+_user_cache_lock = Lock()
+
+
+def _token_subject(token: str) -> Optional[str]:
+    """Return the verified subject of a bearer token, skipping signature checks for recently seen tokens."""
+    key = hashlib.sha256(token.encode()).digest()[:16]
+    with _jwt_cache_lock:
+        cached = _jwt_cache.get(key)
+    if cached is not None:
+        subject, exp = cached
+        if time.time() < exp:
+            return subject
+        with _jwt_cache_lock:
+            _jwt_cache.pop(key, None)
+
+    claims = decode_access_token_claims(token)
+    if claims is None or claims.get("sub") is None:
+        # Failures are never cached
+        return None
+    subject = str(claims["sub"])
+    if claims.get("exp") is not None:
+        with _jwt_cache_lock:
+            _jwt_cache[key] = (subject, float(claims["exp"]))
+    return subject
+
 
 # PUBLIC_INTERFACE
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     """Dependency that extracts and validates the current user from a Bearer token."""
-    subject = decode_access_token(token)
+    subject = _token_subject(token)
     if subject is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
     # subject is user id
-    user = db.query(User).filter(User.id == int(subject)).first()
+    user_id = int(subject)
+    with _user_cache_lock:
+        user = _user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    db.expunge(user)
+    with _user_cache_lock:
+        _user_cache[user_id] = user
     return user
 
 
@@ -32,6 +86,80 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     return current_user
 
 
+# PUBLIC_INTERFACE
+def json_body(model: Type[ModelT]) -> Callable[[Request], Any]:
+    """
+    Dependency factory that parses and validates a JSON request body in a single pass with
+    `model.model_validate_json` (pydantic-core's jiter), instead of json.loads followed by validation.
+
+    Invalid bodies produce the same 422 response FastAPI would. Declare the route with
+    `openapi_extra=json_body_openapi(model)` so the request schema stays documented.
+    """
+
+    async def parse(request: Request) -> ModelT:
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as exc:
+            errors = [{**err, "loc": ("body", *err["loc"])} for err in exc.errors(include_url=False)]
+            raise RequestValidationError(errors)
+
+    return parse
+
+
+# Models whose request bodies are parsed by json_body(); their schemas join components/schemas
+_json_body_models: dict[str, Type[BaseModel]] = {}
+
+
+# PUBLIC_INTERFACE
+def json_body_openapi(model: Type[BaseModel]) -> dict[str, Any]:
+    """OpenAPI requestBody declaration for a route whose body is parsed by `json_body(model)`."""
+    _json_body_models[model.__name__] = model
+    return {
+        "requestBody": {
+            "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{model.__name__}"}}},
+            "required": True,
+        }
+    }
+
+
+# PUBLIC_INTERFACE
+def json_body_components() -> dict[str, Any]:
+    """components/schemas entries for every model declared through json_body_openapi()."""
+    schemas: dict[str, Any] = {}
+    for name, model in _json_body_models.items():
+        schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+        schemas.update(schema.pop("$defs", {}))
+        schemas[name] = schema
+    return schemas
+
+
+# PUBLIC_INTERFACE
+class UTCJSONResponse(ORJSONResponse):
+    """ORJSONResponse writing UTC datetimes with a "Z" suffix, as pydantic's model_dump_json does."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z)
+
+
+# PUBLIC_INTERFACE
+def make_etag(data: bytes) -> str:
+    """Strong, quoted ETag for a representation (or a version key standing in for it)."""
+    return f'"{hashlib.blake2b(data, digest_size=8).hexdigest()}"'
+
+
+# PUBLIC_INTERFACE
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists `etag` (compared weakly, as RFC 9110 requires) or is `*`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
 def pagination_params(page: Optional[int] = 1, page_size: Optional[int] = 20) -> tuple[int, int]:
     """Utility to convert page & page_size into offset & limit."""
     page = page or 1
@@ -1,10 +1,21 @@
+import hashlib
+import os
+import tempfile
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.api.deps import UTCJSONResponse, json_body_components
 from src.api.routers.auth import router as auth_router
 from src.api.routers.recipes import router as recipes_router
 from src.core.config import get_settings
-from src.db import run_create_all  # lightweight bootstrap to create tables
+from src.db import bootstrap_schema, engine  # lightweight bootstrap to create tables
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: no advisory file locks, bootstrap runs unserialized
+    fcntl = None
 
 openapi_tags = [
     {"name": "system", "description": "System and health endpoints"},
@@ -12,37 +23,60 @@ openapi_tags = [
     {"name": "recipes", "description": "Recipe management endpoints"},
 ]
 
+settings = get_settings()
+
+
+def _bootstrap_database() -> None:
+    """
+    Create tables if they do not exist and upgrade tables created by older versions in place.
+    This is a simple bootstrap to avoid requiring migrations at this stage. For production,
+    replace with Alembic.
+
+    Workers sharing a database serialize on a blocking file lock keyed by its URL, so they do
+    not issue concurrent DDL. The first one records the schema fingerprint; the others find it
+    once they get the lock and skip the DDL checks.
+    """
+    url_key = hashlib.sha256(engine.url.render_as_string(hide_password=False).encode()).hexdigest()[:16]
+    lock_path = os.path.join(tempfile.gettempdir(), f"recipe_backend_bootstrap_{url_key}.lock")
+    with open(lock_path, "w") as lock_file:
+        if fcntl is not None:
+            # Released when the file is closed
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            bootstrap_schema()
+        except Exception as exc:
+            # Avoid crashing on startup; log to console in this minimal setup.
+            # In production, use a proper logger.
+            print(f"[DB Bootstrap] Skipped create_all due to: {exc}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: bootstrap the database (unless RUN_BOOTSTRAP=0) before serving."""
+    if settings.RUN_BOOTSTRAP:
+        _bootstrap_database()
+    yield
+
+
 app = FastAPI(
     title="Recipe Explorer Backend",
     description="Server-side API for managing users, recipes, and ratings.",
     version="0.1.0",
     openapi_tags=openapi_tags,
+    default_response_class=UTCJSONResponse,
+    lifespan=lifespan,
 )
 
-settings = get_settings()
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS or ["http://localhost:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"],
 )
 
 
-@app.on_event("startup")
-def _startup_bootstrap():
-    """
-    Create tables if they do not exist. This is a simple bootstrap to avoid
-    requiring migrations at this stage. For production, replace with Alembic.
-    """
-    try:
-        run_create_all()
-    except Exception as exc:
-        # Avoid crashing on startup; log to console in this minimal setup.
-        # In production, use a proper logger.
-        print(f"[DB Bootstrap] Skipped create_all due to: {exc}")
-
-
 @app.get("/", summary="Health Check", tags=["system"])
 def health_check():
     """
@@ -57,3 +91,16 @@ def health_check():
 # Register routers
 app.include_router(auth_router)
 app.include_router(recipes_router)
+
+
+def _openapi() -> dict:
+    """FastAPI's schema plus the request models of json_body() routes, which FastAPI does not see."""
+    if app.openapi_schema is None:
+        schema = FastAPI.openapi(app)
+        components = schema.setdefault("components", {}).setdefault("schemas", {})
+        for name, model_schema in json_body_components().items():
+            components.setdefault(name, model_schema)
+    return app.openapi_schema
+
+
+app.openapi = _openapi
@@ -1,19 +1,34 @@
 from datetime import timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import EmailStr
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
-from src.api.deps import get_current_active_user
+from src.api.deps import (
+    UTCJSONResponse,
+    etag_matches,
+    get_current_active_user,
+    json_body,
+    json_body_openapi,
+    make_etag,
+)
 from src.core.config import get_settings
 from src.core.security import create_access_token, get_password_hash, verify_password
 from src.db import get_db
-from src.db.models import User
+from src.db.models import User, email_lookup_hash
 from src.schemas.auth import LoginRequest, Token
-from src.schemas.user import UserPublic
+from src.schemas.user import UserPublic, user_public_dict
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+_ACCESS_TOKEN_EXPIRES = timedelta(minutes=get_settings().ACCESS_TOKEN_EXPIRE_MINUTES)
+
+
+def _normalize_email(email: str) -> str:
+    """Canonical form used to store and look up emails, so lookups hit the unique index exactly."""
+    return str(email).strip().lower()
+
 
 @router.post("/register", response_model=UserPublic, summary="Register a new user")
 def register_user(email: EmailStr, password: str, username: str | None = None, db: Session = Depends(get_db)):
@@ -27,18 +42,30 @@ def register_user(email: EmailStr, password: str, username: str | None = None, d
 
     Returns: UserPublic
     """
-    existing = db.query(User).filter(User.email == str(email)).first()
+    email = _normalize_email(email)
+    email_hash = email_lookup_hash(email)
+    existing = db.query(User.id).filter(User.email_hash == email_hash).first()
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    user = User(email=str(email), username=username, password_hash=get_password_hash(password), is_active=True)
-    db.add(user)
+    stmt = insert(User).values(
+        email=email,
+        email_hash=email_hash,
+        username=username,
+        password_hash=get_password_hash(password),
+        is_active=True,
+    )
+    user = db.execute(stmt.returning(User)).scalar_one()
     db.commit()
-    db.refresh(user)
-    return user
+    return Response(content=UserPublic.from_orm_fast(user).model_dump_json(), media_type="application/json")
 
 
-@router.post("/login", response_model=Token, summary="Login and obtain a JWT")
-def login(data: LoginRequest, db: Session = Depends(get_db)):
+@router.post(
+    "/login",
+    response_model=Token,
+    summary="Login and obtain a JWT",
+    openapi_extra=json_body_openapi(LoginRequest),
+)
+def login(data: LoginRequest = Depends(json_body(LoginRequest)), db: Session = Depends(get_db)):
     """
     Authenticate user and return an access token.
 
@@ -48,19 +75,23 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
 
     Returns: Token
     """
-    user = db.query(User).filter(User.email == str(data.email)).first()
+    email = _normalize_email(data.email)
+    user = db.query(User).filter(User.email_hash == email_lookup_hash(email)).first()
     if not user or not verify_password(data.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
 
-    settings = get_settings()
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    token = create_access_token(subject=user.id, expires_delta=access_token_expires)
-    return Token(access_token=token, token_type="bearer")
+    token = create_access_token(subject=user.id, expires_delta=_ACCESS_TOKEN_EXPIRES)
+    return UTCJSONResponse({"access_token": token, "token_type": "bearer"})
 
 
 @router.get("/me", response_model=UserPublic, summary="Get current authenticated user")
-def read_users_me(current_user: User = Depends(get_current_active_user)):
+def read_users_me(request: Request, current_user: User = Depends(get_current_active_user)):
     """
-    Requires Bearer token. Returns the current user's public info.
+    Requires Bearer token. Returns the current user's public info, with an ETag; a matching
+    If-None-Match gets an empty 304.
     """
-    return current_user
+    # The ETag changes whenever the row does (updated_at); UserPublic only documents the shape
+    etag = make_etag(f"{current_user.id}:{current_user.updated_at.isoformat()}".encode())
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return UTCJSONResponse(user_public_dict(current_user), headers={"ETag": etag})
@@ -1,20 +1,71 @@
+import base64
+import struct
+from datetime import datetime, timedelta, timezone
+from threading import Lock
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, asc, desc, func, cast, Text
-from sqlalchemy.orm import Session
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import and_, asc, desc, func, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from src.api.deps import get_current_active_user, pagination_params
+from src.api.deps import (
+    etag_matches,
+    get_current_active_user,
+    json_body,
+    json_body_openapi,
+    make_etag,
+    pagination_params,
+)
 from src.db import get_db
-from src.db.models import Recipe, RecipeRating, User
-from src.schemas.recipe import RatingCreate, RecipeCreate, RecipeOut, RecipeUpdate
+from src.db.models import (
+    Recipe,
+    RecipeRating,
+    User,
+    array_contains_all,
+    full_text_match,
+    json_text,
+    prep_time_from_metadata,
+    recipe_search_text,
+    timestamp_literal,
+)
+from src.schemas.recipe import RatingCreate, RecipeCreate, RecipeOut, RecipeUpdate, recipe_list_adapter
 
 router = APIRouter(prefix="/recipes", tags=["recipes"])
 
+# Fields folded into Recipe.search_text, in recipe_search_text() argument order
+_SEARCH_FIELDS = ("title", "description", "ingredients", "steps", "tags")
+
+# Serialized list pages keyed by (_recipes_version, normalized query). Every recipe or rating
+# write bumps the version, so this process never serves a page older than its own last write;
+# other workers' writes are only picked up when entries expire.
+_list_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_list_cache_lock = Lock()
+_recipes_version = 0
+
+
+def _bump_recipes_version() -> None:
+    """Invalidate cached list pages after a committed write to recipes or ratings."""
+    global _recipes_version
+    with _list_cache_lock:
+        _recipes_version += 1
+        _list_cache.clear()
+
+
+def _dialect_insert(db: Session):
+    """Return the INSERT construct of the bound backend so ON CONFLICT clauses are available."""
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert
+    return sqlite_insert
+
 
 def _apply_filters(
-    query,
+    stmt,
     search: Optional[str],
+    search_contains: Optional[str],
     tags: Optional[List[str]],
     cuisine: Optional[str],
     difficulty: Optional[str],
@@ -24,31 +75,72 @@ def _apply_filters(
     """Apply optional filters to the recipe query using metadata fields for cuisine/difficulty/time."""
     filters = []
     if search:
-        pattern = f"%{search.lower()}%"
-        filters.append(func.lower(Recipe.title).like(pattern))
+        # Full-text index lookup; every word must match as a prefix
+        filters.append(full_text_match(Recipe.__table__, search))
+    if search_contains:
+        # Substring match: served by the pg_trgm index on Postgres, a scan on SQLite
+        filters.append(Recipe.title_lower.contains(search_contains.lower(), autoescape=True))
     if tags:
-        # tags stored as array/JSON - check overlap; SQLite fallback: simple LIKE across serialized json
-        for t in tags:
-            pattern = f"%{t}%"
-            filters.append(cast(Recipe.tags, Text).like(pattern))  # generic approach
+        filters.append(array_contains_all(Recipe.tags, tags))
     if cuisine:
-        filters.append(cast(Recipe.recipe_metadata, Text).like(f'%\\"cuisine\\": \\"{cuisine}\\"%'))
+        filters.append(json_text(Recipe.recipe_metadata, "cuisine") == cuisine)
     if difficulty:
-        filters.append(cast(Recipe.recipe_metadata, Text).like(f'%\\"difficulty\\": \\"{difficulty}\\"%'))
+        filters.append(json_text(Recipe.recipe_metadata, "difficulty") == difficulty)
     if min_time is not None:
-        filters.append(cast(Recipe.recipe_metadata, Text).like('%"time":'))
-        # filter strictly by numeric needs richer JSON operators; for SQLite generic fallback skip strict compare
+        filters.append(Recipe.prep_time_minutes >= min_time)
     if max_time is not None:
-        filters.append(cast(Recipe.recipe_metadata, Text).like('%"time":'))
+        filters.append(Recipe.prep_time_minutes <= max_time)
     if filters:
-        query = query.filter(and_(*filters))
-    return query
+        stmt = stmt.where(and_(*filters))
+    return stmt
+
+
+def _recipe_load_options():
+    """
+    Loader options for read endpoints: authors arrive in one batched SELECT ... WHERE users.id IN (...)
+    with only the columns RecipeOut embeds, and any other relationship access raises instead of
+    lazily issuing a query per row.
+    """
+    return (selectinload(Recipe.owner).load_only(User.id, User.username), raiseload("*"))
+
+
+def _recipe_response(obj: Recipe) -> Response:
+    """Serialize one recipe to JSON bytes, bypassing FastAPI's second validation of the response model."""
+    content = RecipeOut.model_validate(obj).model_dump_json(by_alias=True)
+    return Response(content=content, media_type="application/json")
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Keyset cursor payload: created_at as microseconds since the epoch (UTC), then id
+_CURSOR = struct.Struct(">qq")
+
+
+def _parse_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode an opaque keyset cursor into (created_at, id)."""
+    try:
+        epoch_us, last_id = _CURSOR.unpack(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        # OverflowError: a well-formed cursor whose timestamp lies outside datetime's range
+        return _EPOCH + timedelta(microseconds=epoch_us), last_id
+    except (ValueError, OverflowError, struct.error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _make_cursor(recipe: Recipe) -> str:
+    """Opaque, URL-safe keyset cursor pointing just past the given recipe."""
+    created_at = recipe.created_at
+    if created_at.tzinfo is None:
+        # SQLite hands CURRENT_TIMESTAMP back naive; it is UTC
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    epoch_us = (created_at - _EPOCH) // timedelta(microseconds=1)
+    return base64.urlsafe_b64encode(_CURSOR.pack(epoch_us, recipe.id)).rstrip(b"=").decode()
 
 
 # PUBLIC_INTERFACE
 @router.get("", response_model=List[RecipeOut], summary="List recipes with optional filters")
 def list_recipes(
+    request: Request,
     search: Optional[str] = None,
+    search_contains: Optional[str] = None,
     tags: Optional[List[str]] = Query(default=None),
     cuisine: Optional[str] = None,
     difficulty: Optional[str] = None,
@@ -57,50 +149,118 @@ def list_recipes(
     sort: Optional[str] = "newest",  # newest, oldest, rating
     page: Optional[int] = 1,
     page_size: Optional[int] = 20,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
     """
     Returns a paginated list of recipes filtered by search/tags/cuisine/difficulty/time.
-    Sorting supports newest/oldest/rating.
+    `search` matches every word (as a prefix) in title, description, ingredients, steps or tags;
+    `search_contains` matches a substring of the title. Sorting supports newest/oldest/rating.
+
+    Headers: X-Total-Count (matches after the cursor, if any), X-Next-Cursor on a full
+    newest/oldest page (pass it back as `cursor` to fetch the next page), and ETag
+    (send it as If-None-Match to get an empty 304 while the page is unchanged).
     """
-    query = db.query(Recipe)
-    query = _apply_filters(query, search, tags, cuisine, difficulty, min_time, max_time)
+    # Serialized pages are cached in-process until the next write, for at most 60 seconds
+    query_key = (
+        search,
+        search_contains,
+        tuple(tags) if tags else None,
+        cuisine,
+        difficulty,
+        min_time,
+        max_time,
+        sort,
+        pagination_params(page, page_size),
+        cursor,
+    )
+    with _list_cache_lock:
+        cache_key = (_recipes_version, query_key)
+        cached = _list_cache.get(cache_key)
+    if cached is not None:
+        content, headers = cached
+        if etag_matches(request, headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=content, media_type="application/json", headers=headers)
+
+    stmt = select(Recipe, func.count().over().label("total")).options(*_recipe_load_options())
+    filter_args = (search, search_contains, tags, cuisine, difficulty, min_time, max_time)
+    stmt = _apply_filters(stmt, *filter_args)
 
-    if sort == "oldest":
-        query = query.order_by(asc(Recipe.created_at))
-    elif sort == "rating":
-        query = query.order_by(desc(Recipe.avg_rating.nullslast()))
+    if sort == "rating":
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="cursor is only supported for newest/oldest sorts"
+            )
+        stmt = stmt.order_by(desc(Recipe.avg_rating).nullslast())
+    elif sort == "oldest":
+        stmt = stmt.order_by(asc(Recipe.created_at), asc(Recipe.id))
     else:
-        query = query.order_by(desc(Recipe.created_at))
+        stmt = stmt.order_by(desc(Recipe.created_at), desc(Recipe.id))
 
     offset, limit = pagination_params(page, page_size)
-    items = query.offset(offset).limit(limit).all()
-    return items
+    if cursor:
+        # Keyset on (created_at, id): deep pages cost the same as the first
+        created_at, last_id = _parse_cursor(cursor)
+        key = tuple_(Recipe.created_at, Recipe.id)
+        bound = tuple_(timestamp_literal(created_at), last_id)
+        stmt = stmt.where(key > bound if sort == "oldest" else key < bound)
+        offset = 0
+
+    # COUNT(*) OVER () yields the total in the same query as the page
+    rows = db.execute(stmt.offset(offset).limit(limit)).all()
+    if rows:
+        total = rows[0].total
+    elif offset:
+        # Past the last page the window has no rows to report on, so count explicitly
+        filtered = _apply_filters(select(Recipe.id), *filter_args)
+        total = db.execute(select(func.count()).select_from(filtered.subquery())).scalar_one()
+    else:
+        total = 0
+    headers = {"X-Total-Count": str(total)}
+    if sort != "rating" and len(rows) == limit:
+        headers["X-Next-Cursor"] = _make_cursor(rows[-1].Recipe)
+    # One prebuilt TypeAdapter call for the whole page; response_model only documents the shape
+    items = recipe_list_adapter.validate_python([row.Recipe for row in rows])
+    content = recipe_list_adapter.dump_json(items, by_alias=True)
+    headers["ETag"] = make_etag(content)
+    with _list_cache_lock:
+        # Keyed by the version read before querying: a page that raced a write is never served
+        _list_cache[cache_key] = (content, headers)
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 # PUBLIC_INTERFACE
-@router.post("", response_model=RecipeOut, summary="Create a recipe")
+@router.post("", response_model=RecipeOut, summary="Create a recipe", openapi_extra=json_body_openapi(RecipeCreate))
 def create_recipe(
-    recipe: RecipeCreate,
+    recipe: RecipeCreate = Depends(json_body(RecipeCreate)),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
     """
     Create a recipe for the authenticated user.
     """
-    obj = Recipe(
+    stmt = insert(Recipe).values(
         owner_id=current_user.id,
         title=recipe.title,
+        title_lower=recipe.title.lower(),
         description=recipe.description,
         ingredients=recipe.ingredients,
         steps=recipe.steps,
         tags=recipe.tags,
         recipe_metadata=recipe.metadata,
+        prep_time_minutes=prep_time_from_metadata(recipe.metadata),
+        search_text=recipe_search_text(recipe.title, recipe.description, recipe.ingredients, recipe.steps, recipe.tags),
     )
-    db.add(obj)
+    # RETURNING hands back server defaults (id, timestamps) without a refresh SELECT
+    obj = db.execute(stmt.returning(Recipe)).scalar_one()
     db.commit()
-    db.refresh(obj)
-    return obj
+    _bump_recipes_version()
+    # The author is the caller: embed that user rather than lazily SELECTing users.* for RecipeOut
+    set_committed_value(obj, "owner", current_user)
+    return _recipe_response(obj)
 
 
 # PUBLIC_INTERFACE
@@ -109,10 +269,10 @@ def get_recipe(recipe_id: int, db: Session = Depends(get_db)):
     """
     Retrieve a recipe by ID.
     """
-    obj = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    obj = db.execute(select(Recipe).where(Recipe.id == recipe_id).options(*_recipe_load_options())).scalar_one_or_none()
     if not obj:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
-    return obj
+    return _recipe_response(obj)
 
 
 # PUBLIC_INTERFACE
@@ -126,21 +286,39 @@ def update_recipe(
     """
     Update fields of a recipe. Only the owner can update.
     """
-    obj = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if not obj:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
-    if obj.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-
+    values = {}
     for field, value in data.model_dump(exclude_unset=True).items():
         # Map external field name 'metadata' to ORM attribute 'recipe_metadata'
         target_field = "recipe_metadata" if field == "metadata" else field
-        setattr(obj, target_field, value)
+        values[target_field] = value
+        if field == "metadata":
+            values["prep_time_minutes"] = prep_time_from_metadata(value)
+        elif field == "title" and value is not None:
+            values["title_lower"] = value.lower()
 
-    db.add(obj)
+    # Ownership is checked by the UPDATE itself; 404 vs 403 is only resolved when nothing matched
+    owned = and_(Recipe.id == recipe_id, Recipe.owner_id == current_user.id)
+    if any(field in values for field in _SEARCH_FIELDS):
+        # search_text also covers fields this request leaves alone: merge with the stored ones
+        stored = db.execute(
+            select(*(getattr(Recipe, field) for field in _SEARCH_FIELDS)).where(owned).with_for_update()
+        ).first()
+        if stored is not None:
+            merged = {**stored._asdict(), **{field: values[field] for field in _SEARCH_FIELDS if field in values}}
+            values["search_text"] = recipe_search_text(**merged)
+    if values:
+        obj = db.execute(update(Recipe).where(owned).values(**values).returning(Recipe)).scalar_one_or_none()
+    else:
+        obj = db.execute(select(Recipe).where(owned)).scalar_one_or_none()
+    if obj is None:
+        if db.execute(select(Recipe.id).where(Recipe.id == recipe_id)).first() is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     db.commit()
-    db.refresh(obj)
-    return obj
+    _bump_recipes_version()
+    # Only the owner gets here, so the caller is the author RecipeOut embeds
+    set_committed_value(obj, "owner", current_user)
+    return _recipe_response(obj)
 
 
 # PUBLIC_INTERFACE
@@ -160,43 +338,62 @@ def delete_recipe(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
     db.delete(obj)
     db.commit()
+    _bump_recipes_version()
     return None
 
 
 # PUBLIC_INTERFACE
-@router.post("/{recipe_id}/rate", response_model=RecipeOut, summary="Rate a recipe (auth)")
+@router.post(
+    "/{recipe_id}/rate",
+    response_model=RecipeOut,
+    summary="Rate a recipe (auth)",
+    openapi_extra=json_body_openapi(RatingCreate),
+)
 def rate_recipe(
     recipe_id: int,
-    rating: RatingCreate,
+    rating: RatingCreate = Depends(json_body(RatingCreate)),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
     """
     Create or update a rating for the recipe by the current user and update average rating.
     """
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if not recipe:
+    # Lock the recipe first: a missing recipe is a 404 before any rating is written, and
+    # concurrent rates of the same recipe apply their deltas one at a time
+    if db.execute(select(Recipe.id).where(Recipe.id == recipe_id).with_for_update()).first() is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
 
-    existing = (
-        db.query(RecipeRating)
-        .filter(RecipeRating.recipe_id == recipe_id, RecipeRating.user_id == current_user.id)
-        .first()
-    )
-    if existing:
-        existing.rating = rating.rating
-        existing.comment = rating.comment
-        db.add(existing)
-    else:
-        rr = RecipeRating(user_id=current_user.id, recipe_id=recipe_id, rating=rating.rating, comment=rating.comment)
-        db.add(rr)
-
-    db.commit()
+    own_rating = and_(RecipeRating.user_id == current_user.id, RecipeRating.recipe_id == recipe_id)
+    previous = db.execute(select(RecipeRating.rating).where(own_rating).with_for_update()).scalar_one_or_none()
+    if previous is None:
+        stmt = _dialect_insert(db)(RecipeRating).values(
+            user_id=current_user.id, recipe_id=recipe_id, rating=rating.rating, comment=rating.comment
+        )
+        inserted = db.execute(stmt.on_conflict_do_nothing().returning(RecipeRating.id)).first()
+        if inserted is None:
+            # A concurrent request by the same user inserted first; update that row instead
+            previous = db.execute(select(RecipeRating.rating).where(own_rating).with_for_update()).scalar_one()
+    if previous is not None:
+        db.execute(
+            update(RecipeRating).where(own_rating).values(rating=rating.rating, comment=rating.comment)
+        )
 
-    # Recompute average
-    avg = db.query(func.avg(RecipeRating.rating)).filter(RecipeRating.recipe_id == recipe_id).scalar()
-    recipe.avg_rating = float(avg) if avg is not None else None
-    db.add(recipe)
+    delta = rating.rating - (previous or 0)
+    added = 0 if previous is not None else 1
+    # Adjust the running totals by this rating's delta instead of re-averaging every rating.
+    # SET expressions all see the pre-update row, so the average uses the new totals.
+    totals = (
+        update(Recipe)
+        .where(Recipe.id == recipe_id)
+        .values(
+            sum_rating=Recipe.sum_rating + delta,
+            num_ratings=Recipe.num_ratings + added,
+            avg_rating=(Recipe.sum_rating + delta) * 1.0 / (Recipe.num_ratings + added),
+        )
+        .returning(Recipe)
+    )
+    # The author may be anyone: load just the columns RecipeOut embeds, as the read endpoints do
+    recipe = db.execute(select(Recipe).from_statement(totals).options(*_recipe_load_options())).scalar_one()
     db.commit()
-    db.refresh(recipe)
-    return recipe
+    _bump_recipes_version()
+    return _recipe_response(recipe)
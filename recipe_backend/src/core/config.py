@@ -2,7 +2,7 @@ import os
 from functools import lru_cache
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Settings(BaseModel):
@@ -22,9 +22,22 @@ class Settings(BaseModel):
         description="Allowed CORS origins",
     )
     DATABASE_URL: Optional[str] = Field(default=os.getenv("DATABASE_URL"), description="DB connection string")
+    RUN_BOOTSTRAP: bool = Field(
+        default=os.getenv("RUN_BOOTSTRAP", "1") == "1", description="Create missing tables on startup"
+    )
+    DB_POOL_SIZE: int = Field(default=int(os.getenv("DB_POOL_SIZE", "20")), description="Persistent DB connections")
+    DB_MAX_OVERFLOW: int = Field(
+        default=int(os.getenv("DB_MAX_OVERFLOW", "10")), description="Extra DB connections allowed under burst load"
+    )
+    DB_POOL_TIMEOUT: int = Field(
+        default=int(os.getenv("DB_POOL_TIMEOUT", "30")), description="Seconds to wait for a pooled connection"
+    )
+    DB_POOL_RECYCLE: int = Field(
+        default=int(os.getenv("DB_POOL_RECYCLE", "3600")), description="Seconds before a pooled connection is replaced"
+    )
 
-    class Config:
-        arbitrary_types_allowed = True
+    # Read once from the environment and never mutated, so the cached instance is frozen
+    model_config = ConfigDict(arbitrary_types_allowed=True, frozen=True)
 
 
 # PUBLIC_INTERFACE
@@ -1,22 +1,53 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
 from datetime import datetime, timedelta, timezone
+from threading import Lock
 from typing import Any, Optional
 
-from jose import JWTError, jwt
+from cachetools import TTLCache
+from jose import jwt
 from passlib.context import CryptContext
 
 from src.core.config import get_settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_SIGNING_KEY = get_settings().SECRET_KEY.encode()
+# Keyed HS256 state built once; each token verification copies it instead of re-ingesting the key
+_HMAC_TEMPLATE = hmac.new(_SIGNING_KEY, digestmod=hashlib.sha256)
+
+# New hashes use argon2id; existing bcrypt hashes still verify.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,
+    argon2__parallelism=1,
+)
+
+# Recent successful verifications, keyed by an HMAC over (stored hash, plaintext) so raw passwords
+# never sit in memory and a changed password hash can never hit a stale entry. Failures are not cached.
+_verified_cache: TTLCache = TTLCache(maxsize=2048, ttl=30)
+_verified_cache_lock = Lock()
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a plaintext password using bcrypt."""
+    """Hash a plaintext password using argon2id."""
     return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, password_hash: str) -> bool:
-    """Verify a plaintext password against a stored bcrypt hash."""
-    return pwd_context.verify(plain_password, password_hash)
+    """Verify a plaintext password against a stored hash, skipping the KDF for recently verified pairs."""
+    key = hmac.new(_SIGNING_KEY, f"{password_hash}:{plain_password}".encode(), hashlib.sha256).digest()
+    with _verified_cache_lock:
+        if key in _verified_cache:
+            return True
+    if not pwd_context.verify(plain_password, password_hash):
+        return False
+    with _verified_cache_lock:
+        _verified_cache[key] = True
+    return True
 
 
 # PUBLIC_INTERFACE
@@ -32,13 +63,48 @@ def create_access_token(subject: str | int, expires_delta: Optional[timedelta] =
     return encoded_jwt
 
 
+def _b64url_decode(segment: str) -> bytes:
+    """Decode an unpadded base64url JWT segment."""
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+# PUBLIC_INTERFACE
+def decode_access_token_claims(token: str) -> Optional[dict[str, Any]]:
+    """
+    Decode an HS256 JWT and return all of its claims if signature and expiry are valid, else None.
+
+    Verification copies the prebuilt keyed HMAC rather than going through python-jose, which
+    re-derives the key on every call.
+    """
+    if token.count(".") != 2:
+        return None
+    signing_input, _, signature = token.rpartition(".")
+    header_segment, _, payload_segment = signing_input.partition(".")
+    try:
+        header = json.loads(_b64url_decode(header_segment))
+        if not isinstance(header, dict) or header.get("alg") != "HS256":
+            return None
+        mac = _HMAC_TEMPLATE.copy()
+        mac.update(signing_input.encode("ascii"))
+        if not hmac.compare_digest(mac.digest(), _b64url_decode(signature)):
+            return None
+        claims = json.loads(_b64url_decode(payload_segment))
+    except ValueError:
+        # Covers malformed base64 (binascii.Error), non-ASCII input and invalid JSON
+        return None
+    if not isinstance(claims, dict):
+        return None
+    exp = claims.get("exp")
+    if exp is not None and (isinstance(exp, bool) or not isinstance(exp, (int, float)) or time.time() > exp):
+        return None
+    return claims
+
+
 # PUBLIC_INTERFACE
 def decode_access_token(token: str) -> Optional[str]:
     """Decode a JWT and return subject if valid, else None."""
-    settings = get_settings()
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        sub: str = payload.get("sub")  # type: ignore[assignment]
-        return sub
-    except JWTError:
+    claims = decode_access_token_claims(token)
+    if claims is None:
         return None
+    sub: str = claims.get("sub")  # type: ignore[assignment]
+    return sub
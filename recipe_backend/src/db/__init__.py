@@ -5,9 +5,12 @@ Exports:
 - Base: Declarative base for models
 - session: engine, SessionLocal, get_db dependency, run_create_all
 - models: ORM models (User, Recipe, RecipeRating)
+- upgrade_schema: adds and backfills columns missing from tables created by older versions
+- bootstrap_schema: create_all + upgrade_schema, skipped once the database is at the current schema
 """
 from .session import Base, engine, SessionLocal, get_db, run_create_all
 from . import models
+from .upgrade import bootstrap_schema, upgrade_schema
 
 __all__ = [
     "Base",
@@ -16,4 +19,6 @@ __all__ = [
     "get_db",
     "run_create_all",
     "models",
+    "upgrade_schema",
+    "bootstrap_schema",
 ]
@@ -1,14 +1,28 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+import hashlib
+import re
+
 from sqlalchemy import (
+    DDL,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
+    and_,
+    column,
+    event,
+    false,
     func,
+    literal,
+    literal_column,
+    select,
+    table,
 )
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -41,6 +55,111 @@ else:
         return ARRAY(String)
 
 
+# PUBLIC_INTERFACE
+def json_text(column, key: str):
+    """
+    Text value of a top-level key in a JSON column.
+
+    The key is rendered as a literal (not a bound parameter) so that filters compile to exactly
+    the same expression as the functional indexes declared below and can use them.
+    """
+    if _is_sqlite():
+        return func.json_extract(column, literal_column(f"'$.{key}'"))
+    return column.op("->>", return_type=Text)(literal_column(f"'{key}'"))
+
+
+# PUBLIC_INTERFACE
+def timestamp_literal(value: datetime):
+    """
+    Bind a datetime for comparison against server-defaulted timestamp columns.
+
+    SQLite stores CURRENT_TIMESTAMP as text without fractional seconds and compares text lexically,
+    so the value is bound in that same textual form rather than SQLAlchemy's microsecond format.
+    """
+    if _is_sqlite():
+        return literal(value.replace(tzinfo=None).isoformat(sep=" "), String)
+    return literal(value, DateTime(timezone=True))
+
+
+_SEARCH_TOKEN = re.compile(r"\w+")
+
+# Full-text index over recipe text, created alongside the recipes table (see the DDL below the model)
+_recipes_fts = table("recipes_fts", column("rowid", Integer))
+
+
+def _search_document(recipes):
+    """Postgres tsvector of a recipe's search_text, shared by the GIN index and the query."""
+    return func.to_tsvector(literal_column("'simple'"), recipes.c.search_text)
+
+
+# PUBLIC_INTERFACE
+def recipe_search_text(
+    title: str,
+    description: Optional[str],
+    ingredients: Optional[List[str]],
+    steps: Optional[List[str]],
+    tags: Optional[List[str]],
+) -> str:
+    """Text indexed for full-text search, stored in Recipe.search_text on every write of these fields."""
+    parts = [title, description or "", *(ingredients or []), *(steps or []), *(tags or [])]
+    return "\n".join(part for part in parts if part)
+
+
+# PUBLIC_INTERFACE
+def prep_time_from_metadata(metadata: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Read metadata["time"] as whole minutes for the indexed prep_time_minutes column."""
+    value = (metadata or {}).get("time")
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# PUBLIC_INTERFACE
+def email_lookup_hash(email: str) -> bytes:
+    """blake2b-128 of the normalized (stripped, lowercased) email, stored in User.email_hash."""
+    return hashlib.blake2b(email.strip().lower().encode(), digest_size=16).digest()
+
+
+# PUBLIC_INTERFACE
+def full_text_match(recipes, query: str):
+    """
+    Condition that a recipe matches every word of a free-text query, each word as a prefix.
+
+    Both backends index search_text (title, description, ingredients, steps, tags): SQLite through
+    the recipes_fts FTS5 table, Postgres through a GIN-indexed tsvector. A query without any word
+    characters matches nothing.
+    """
+    tokens = _SEARCH_TOKEN.findall(query.lower())
+    if not tokens:
+        return false()
+    if _is_sqlite():
+        # Quoted tokens are plain strings to FTS5, so user input cannot inject query syntax
+        fts_query = " ".join(f'"{token}"*' for token in tokens)
+        matches = select(_recipes_fts.c.rowid).where(literal_column("recipes_fts").op("MATCH")(fts_query))
+        return recipes.c.id.in_(matches)
+    ts_query = " & ".join(f"{token}:*" for token in tokens)
+    return _search_document(recipes).op("@@")(func.to_tsquery(literal_column("'simple'"), ts_query))
+
+
+# PUBLIC_INTERFACE
+def array_contains_all(column, values: List[str]):
+    """
+    Condition that an array-of-strings column contains every value.
+
+    Postgres uses the native ARRAY @> operator; SQLite checks each value against json_each().
+    """
+    if not _is_sqlite():
+        return column.contains(values)
+    conditions = []
+    for value in values:
+        each = func.json_each(column).table_valued("value")
+        conditions.append(select(1).select_from(each).where(each.c.value == value).exists())
+    return and_(*conditions)
+
+
 class User(Base):
     """
     User accounts for authentication and ownership of recipes/ratings.
@@ -49,6 +168,8 @@ class User(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
+    # blake2b-128 of the normalized email, maintained on write: a fixed 16-byte key for login lookups
+    email_hash: Mapped[bytes] = mapped_column(LargeBinary(16), unique=True, index=True, nullable=False)
     username: Mapped[Optional[str]] = mapped_column(String(50), unique=True, index=True, nullable=True)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     is_active: Mapped[bool] = mapped_column(default=True, nullable=False)
@@ -77,6 +198,10 @@ class Recipe(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    # Lowercased copy of title, maintained on write, so search never applies lower() per row
+    title_lower: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Title, description, ingredients, steps and tags as plain text, maintained on write for full-text search
+    search_text: Mapped[str] = mapped_column(Text, nullable=False, default="", server_default="")
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     ingredients: Mapped[List[str] | None] = mapped_column(ArrayOfString(), nullable=True)
     steps: Mapped[List[str] | None] = mapped_column(ArrayOfString(), nullable=True)
@@ -84,6 +209,11 @@ class Recipe(Base):
     # Use a non-reserved attribute name for JSON metadata.
     # Keep the database column name as 'recipe_metadata' (new) since there is no migration system here.
     recipe_metadata: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONType, nullable=True)
+    # Denormalized from recipe_metadata["time"] so min/max time filters can use a B-tree range scan
+    prep_time_minutes: Mapped[Optional[int]] = mapped_column(Integer, index=True, nullable=True)
+    # Running rating totals maintained by the rate endpoint; avg_rating is derived from them on write
+    sum_rating: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    num_ratings: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     avg_rating: Mapped[Optional[float]] = mapped_column(nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -99,6 +229,42 @@ class Recipe(Base):
     )
 
 
+# Keyset pagination over (created_at, id) in either direction
+Index("ix_recipes_created_at_id", Recipe.__table__.c.created_at, Recipe.__table__.c.id)
+# Expression indexes backing the equality filters on metadata keys in the recipe list endpoint
+Index("ix_recipes_cuisine", json_text(Recipe.__table__.c.recipe_metadata, "cuisine"))
+Index("ix_recipes_difficulty", json_text(Recipe.__table__.c.recipe_metadata, "difficulty"))
+if not _is_sqlite():
+    Index("ix_recipes_tags", Recipe.__table__.c.tags, postgresql_using="gin")
+    # Attached explicitly: the leading 'simple' config literal keeps Index from inferring the table
+    Recipe.__table__.append_constraint(
+        Index("ix_recipes_search", _search_document(Recipe.__table__), postgresql_using="gin")
+    )
+    # Trigram index for substring (LIKE '%term%') search; requires the pg_trgm extension
+    Index(
+        "ix_recipes_title_lower_trgm",
+        Recipe.__table__.c.title_lower,
+        postgresql_using="gin",
+        postgresql_ops={"title_lower": "gin_trgm_ops"},
+    )
+
+# SQLite full-text search: an external-content FTS5 table over recipes.search_text (it stores
+# only the index, reading rows back from recipes), kept in sync by triggers
+RECIPES_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5(search_text, content='recipes', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS recipes_fts_ai AFTER INSERT ON recipes BEGIN "
+    "INSERT INTO recipes_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS recipes_fts_ad AFTER DELETE ON recipes BEGIN "
+    "INSERT INTO recipes_fts(recipes_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS recipes_fts_au AFTER UPDATE OF search_text ON recipes BEGIN "
+    "INSERT INTO recipes_fts(recipes_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+    "INSERT INTO recipes_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+)
+for _ddl in RECIPES_FTS_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(_ddl).execute_if(dialect="sqlite"))
+event.listen(Recipe.__table__, "before_drop", DDL("DROP TABLE IF EXISTS recipes_fts").execute_if(dialect="sqlite"))
+
+
 class RecipeRating(Base):
     """
     Ratings given by users to recipes.
@@ -106,11 +272,13 @@ class RecipeRating(Base):
     __tablename__ = "recipe_ratings"
     __table_args__ = (
         UniqueConstraint("user_id", "recipe_id", name="uq_user_recipe_rating"),
+        # Serves recipe_id lookups (e.g. cascading deletes); also covers ad-hoc AVG(rating) checks
+        Index("ix_recipe_ratings_recipe_rating", "recipe_id", "rating"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
-    recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), index=True)
+    recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"))
     rating: Mapped[int] = mapped_column(Integer, nullable=False)  # 1..5 typical
     comment: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
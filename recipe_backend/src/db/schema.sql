@@ -2,3 +2,12 @@
 -- Not executed automatically; use SQLAlchemy metadata.create_all in code.
 -- For Postgres, prefer migrations (e.g., Alembic) in production.
 -- This file is intentionally minimal as the authoritative schema is defined in ORM models.
+--
+-- Upgrading an existing database: create_all never alters tables that already exist. Columns added
+-- to users/recipes since the first release (users.email_hash; recipes.title_lower, search_text,
+-- prep_time_minutes, sum_rating, num_ratings), their indexes and the SQLite recipes_fts table are
+-- added and backfilled by src.db.upgrade.upgrade_schema(), which the app runs at startup after
+-- create_all. It is idempotent; to run it by hand:
+--   python -c "from src.db import upgrade_schema; upgrade_schema()"
+-- email_hash (blake2b) and search_text (JSON array flattening) are computed in Python, which is why
+-- the backfill is not a plain SQL script.
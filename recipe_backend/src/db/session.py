@@ -2,9 +2,12 @@ import os
 from contextlib import contextmanager
 from typing import Generator, Optional
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
+from sqlalchemy.pool import StaticPool
+
+from src.core.config import get_settings
 
 # SQLAlchemy Declarative Base used by models
 Base = declarative_base()
@@ -31,26 +34,82 @@ def _resolve_database_url() -> str:
     return "sqlite:///./test.db"
 
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply per-connection SQLite tuning pragmas."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA mmap_size=67108864")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    # SQLite leaves foreign keys unenforced unless asked, unlike Postgres
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _set_sqlite_memory_pragmas(dbapi_connection, connection_record) -> None:
+    """In-memory SQLite (tests) has nothing to make durable: skip journaling fsyncs entirely."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    # SQLite leaves foreign keys unenforced unless asked, unlike Postgres
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _is_sqlite_memory(db_url: str) -> bool:
+    """True for sqlite URLs without a database file, e.g. sqlite:// or sqlite+pysqlite:///:memory:."""
+    return make_url(db_url).database in (None, "", ":memory:")
+
+
 def _create_engine(db_url: str) -> Engine:
     """
     Create the SQLAlchemy engine with sensible defaults depending on the backend.
-    - SQLite requires check_same_thread=False for typical FastAPI threaded usage.
-    - For Postgres, use default engine creation.
+    - SQLite requires check_same_thread=False for typical FastAPI threaded usage, and every
+      connection is switched to WAL journaling with synchronous=NORMAL and memory-mapped I/O
+      so readers do not block writers and commits fsync less.
+    - In-memory SQLite (used by the test suite) shares a single connection through StaticPool,
+      otherwise every pooled connection would see its own empty database.
+    - For server databases (Postgres), size the QueuePool from settings and pre-ping
+      connections so dead ones are replaced instead of failing a request.
     """
-    connect_args = {}
+    if db_url.startswith("sqlite") and _is_sqlite_memory(db_url):
+        engine = create_engine(
+            db_url,
+            echo=False,
+            future=True,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        event.listen(engine, "connect", _set_sqlite_memory_pragmas)
+        return engine
     if db_url.startswith("sqlite"):
-        connect_args = {"check_same_thread": False}
-    engine = create_engine(db_url, echo=False, future=True, connect_args=connect_args)
-    return engine
+        engine = create_engine(db_url, echo=False, future=True, connect_args={"check_same_thread": False})
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+    settings = get_settings()
+    return create_engine(
+        db_url,
+        echo=False,
+        future=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
 
 
 DATABASE_URL = _resolve_database_url()
 engine: Engine = _create_engine(DATABASE_URL)
 
 # Session factory
+# expire_on_commit=False keeps rows returned by INSERT/UPDATE ... RETURNING usable for the
+# response after commit, instead of re-SELECTing every attribute on first access.
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
+    expire_on_commit=False,
     bind=engine,
     class_=Session,
     future=True,
@@ -99,5 +158,9 @@ def run_create_all(models_base: Optional[declarative_base] = None) -> None:
     """
     Helper to create all tables using metadata. Intended for bootstrap/startup.
     """
+    if engine.url.get_backend_name() == "postgresql":
+        # Trigram indexes on recipe titles need pg_trgm
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     base_meta = (models_base or Base).metadata
-    base_meta.create_all(bind=engine)
+    base_meta.create_all(bind=engine, checkfirst=True)
@@ -0,0 +1,172 @@
+"""
+In-place upgrade for databases created before columns were added to existing tables.
+
+create_all only creates missing tables. upgrade_schema adds the columns introduced since, backfills
+them and creates any missing indexes. Each step checks first and runs in one transaction, so it is
+safe to run on every startup.
+
+bootstrap_schema runs both and records a fingerprint of the resulting schema, so a later start against
+the same database skips the DDL checks entirely.
+"""
+import hashlib
+from typing import Optional
+
+from sqlalchemy import Column, MetaData, String, Table, func, inspect, select, text, update
+from sqlalchemy.engine import Connection, Dialect, Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from .models import (
+    RECIPES_FTS_DDL,
+    Recipe,
+    RecipeRating,
+    User,
+    email_lookup_hash,
+    prep_time_from_metadata,
+    recipe_search_text,
+)
+from .session import Base, engine as default_engine, run_create_all
+
+# Columns computed in Python from other columns of the same row, as the write path does
+_DERIVED_RECIPE_COLUMNS = {
+    "title_lower": lambda row: row.title.lower(),
+    "search_text": lambda row: recipe_search_text(row.title, row.description, row.ingredients, row.steps, row.tags),
+    "prep_time_minutes": lambda row: prep_time_from_metadata(row.recipe_metadata),
+}
+# Running rating totals, backfilled from recipe_ratings
+_RATING_TOTAL_COLUMNS = ("sum_rating", "num_ratings")
+# One row: the schema_fingerprint the last bootstrap brought the database to. Kept out of Base.metadata.
+_schema_state = Table("schema_state", MetaData(), Column("fingerprint", String(64), nullable=False))
+
+
+def _add_column(conn: Connection, column: Column, backfilled: bool) -> None:
+    """
+    ALTER TABLE ... ADD COLUMN. Columns backfilled afterwards are added nullable (NOT NULL is applied
+    once they are filled); the others take their server default, NOT NULL included.
+    """
+    ddl = f"ALTER TABLE {column.table.name} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}"
+    if not backfilled and column.server_default is not None:
+        ddl += f" DEFAULT {column.server_default.arg}"
+        if not column.nullable:
+            ddl += " NOT NULL"
+    conn.execute(text(ddl))
+
+
+def _set_not_null(conn: Connection, column: Column) -> None:
+    """Tighten a backfilled column on Postgres; SQLite cannot alter a column, so it stays nullable there."""
+    if not column.nullable and conn.dialect.name == "postgresql":
+        conn.execute(text(f"ALTER TABLE {column.table.name} ALTER COLUMN {column.name} SET NOT NULL"))
+
+
+def _upgrade_users(conn: Connection, existing: set) -> None:
+    """users.email_hash: the login lookup key."""
+    if "email_hash" in existing:
+        return
+    column = User.__table__.c.email_hash
+    _add_column(conn, column, backfilled=True)
+    for user_id, email in conn.execute(select(User.id, User.email)).all():
+        conn.execute(update(User).where(User.id == user_id).values(email_hash=email_lookup_hash(email)))
+    _set_not_null(conn, column)
+
+
+def _upgrade_recipes(conn: Connection, existing: set) -> None:
+    """recipes columns maintained on write: title_lower, search_text, prep_time_minutes and rating totals."""
+    table = Recipe.__table__
+    derived = [name for name in _DERIVED_RECIPE_COLUMNS if name not in existing]
+    for name in derived:
+        _add_column(conn, table.c[name], backfilled=True)
+    if derived:
+        source = select(
+            Recipe.id,
+            Recipe.title,
+            Recipe.description,
+            Recipe.ingredients,
+            Recipe.steps,
+            Recipe.tags,
+            Recipe.recipe_metadata,
+        )
+        for row in conn.execute(source).all():
+            values = {name: _DERIVED_RECIPE_COLUMNS[name](row) for name in derived}
+            conn.execute(update(Recipe).where(Recipe.id == row.id).values(values))
+        for name in derived:
+            _set_not_null(conn, table.c[name])
+    if "search_text" in derived and conn.dialect.name == "postgresql":
+        # Built over title and description before search_text existed; recreated below
+        conn.execute(text("DROP INDEX IF EXISTS ix_recipes_search"))
+
+    totals = [name for name in _RATING_TOTAL_COLUMNS if name not in existing]
+    for name in totals:
+        _add_column(conn, table.c[name], backfilled=False)
+    if totals:
+        own = RecipeRating.recipe_id == Recipe.id
+        conn.execute(
+            update(Recipe).values(
+                sum_rating=select(func.coalesce(func.sum(RecipeRating.rating), 0)).where(own).scalar_subquery(),
+                num_ratings=select(func.count()).select_from(RecipeRating).where(own).scalar_subquery(),
+            )
+        )
+
+
+def _upgrade_recipes_fts(conn: Connection, tables: set, existing: set) -> None:
+    """SQLite recipes_fts over search_text, (re)built when missing or still indexing the separate fields."""
+    if "recipes_fts" in tables and "search_text" in existing:
+        return
+    for name in ("recipes_fts_ai", "recipes_fts_ad", "recipes_fts_au"):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    conn.execute(text("DROP TABLE IF EXISTS recipes_fts"))
+    for ddl in RECIPES_FTS_DDL:
+        conn.execute(text(ddl))
+    conn.execute(text("INSERT INTO recipes_fts(recipes_fts) VALUES ('rebuild')"))
+
+
+# PUBLIC_INTERFACE
+def upgrade_schema(bind: Optional[Engine] = None) -> None:
+    """Bring tables created by older versions up to the current models; a no-op on an up-to-date database."""
+    bind = bind or default_engine
+    with bind.begin() as conn:
+        inspector = inspect(conn)
+        tables = set(inspector.get_table_names())
+        if User.__tablename__ in tables:
+            _upgrade_users(conn, {c["name"] for c in inspector.get_columns(User.__tablename__)})
+        if Recipe.__tablename__ in tables:
+            existing = {c["name"] for c in inspector.get_columns(Recipe.__tablename__)}
+            _upgrade_recipes(conn, existing)
+            if conn.dialect.name == "sqlite":
+                _upgrade_recipes_fts(conn, tables, existing)
+        for table in Base.metadata.sorted_tables:
+            if table.name in tables:
+                # IF NOT EXISTS rather than checkfirst: reflection does not report SQLite expression indexes
+                for index in table.indexes:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+# PUBLIC_INTERFACE
+def schema_fingerprint(dialect: Dialect) -> str:
+    """sha256 of the DDL the models compile to on this dialect; any table, column or index change alters it."""
+    tables = Base.metadata.sorted_tables
+    ddl = [str(CreateTable(table).compile(dialect=dialect)) for table in tables]
+    for table in tables:
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            ddl.append(str(CreateIndex(index).compile(dialect=dialect)))
+    if dialect.name == "sqlite":
+        ddl += RECIPES_FTS_DDL
+    return hashlib.sha256("\n".join(ddl).encode()).hexdigest()
+
+
+# PUBLIC_INTERFACE
+def bootstrap_schema() -> bool:
+    """
+    run_create_all + upgrade_schema on the app engine, skipped when the database already records the
+    current schema_fingerprint (two catalog reads instead of the per-table checks). Returns whether it ran.
+    """
+    fingerprint = schema_fingerprint(default_engine.dialect)
+    with default_engine.connect() as conn:
+        if inspect(conn).has_table(_schema_state.name):
+            if conn.execute(select(_schema_state.c.fingerprint)).scalar() == fingerprint:
+                return False
+    run_create_all()
+    upgrade_schema()
+    with default_engine.begin() as conn:
+        _schema_state.create(conn, checkfirst=True)
+        conn.execute(_schema_state.delete())
+        conn.execute(_schema_state.insert().values(fingerprint=fingerprint))
+    return True
@@ -1,6 +1,6 @@
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 
 
 class RecipeBase(BaseModel):
@@ -38,13 +38,27 @@ class RecipeUpdate(BaseModel):
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
 
+class RecipeOwner(BaseModel):
+    """Public summary of a recipe's author."""
+
+    id: int = Field(..., description="User ID")
+    username: Optional[str] = Field(None, description="Optional username")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class RecipeOut(RecipeBase):
     id: int = Field(..., description="Recipe ID")
     owner_id: int = Field(..., description="Owner user id")
+    owner: Optional[RecipeOwner] = Field(default=None, description="Recipe author")
 
     model_config = ConfigDict(from_attributes=True)
 
 
+# Built once at import: validates and serializes a whole page of ORM rows in a single pydantic-core call
+recipe_list_adapter = TypeAdapter(List[RecipeOut])
+
+
 class RatingCreate(BaseModel):
     rating: int = Field(..., ge=1, le=5, description="Rating score 1..5")
     comment: Optional[str] = Field(default=None, description="Optional comment")
@@ -1,18 +1,59 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional, TypedDict
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class UserPublic(BaseModel):
     """Public user representation."""
 
     id: int = Field(..., description="User ID")
-    email: EmailStr = Field(..., description="Email address")
+    # Plain str: emails are validated on the way in (register/login), not re-parsed on every response
+    email: str = Field(..., description="Email address", json_schema_extra={"format": "email"})
     username: Optional[str] = Field(None, description="Optional username")
     is_active: bool = Field(..., description="Is the account active")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Update timestamp")
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, validate_assignment=False, extra="ignore")
+
+    @classmethod
+    def from_orm_fast(cls, user: Any) -> "UserPublic":
+        """Build from a trusted ORM row without running validators; the data was validated on write."""
+        return cls.model_construct(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class UserPublicDict(TypedDict):
+    """Plain-dict counterpart of UserPublic for the outbound response layer; no pydantic overhead."""
+
+    id: int
+    email: str
+    username: Optional[str]
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+# PUBLIC_INTERFACE
+def user_public_dict(user: Any) -> UserPublicDict:
+    """
+    Read a User row's public fields once into a plain dict for direct JSON encoding.
+
+    Used on hot read paths instead of constructing a UserPublic; UserPublic stays the
+    response_model so the OpenAPI schema is unchanged.
+    """
+    return {
+        "id": user.id,
+        "email": user.email,
+        "username": user.username,
+        "is_active": user.is_active,
+        "created_at": user.created_at,
+        "updated_at": user.updated_at,
+    }
@@ -0,0 +1,26 @@
+import os
+
+# Must be set before the app (and its engine) is imported: one shared in-memory SQLite connection
+os.environ["DATABASE_URL"] = "sqlite+pysqlite:///:memory:"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.api.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Entering the client runs the app lifespan (DB bootstrap) once for the whole session
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    # Register + login once; every recipe test reuses the same bearer token
+    email, password = "chef@example.com", "cook12345"
+    client.post("/auth/register", params={"email": email, "password": password, "username": "chef"})
+    r = client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
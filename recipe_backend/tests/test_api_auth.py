@@ -1,11 +1,10 @@
-from fastapi.testclient import TestClient
+from datetime import datetime, timezone
 
-from src.api.main import app
+from src.api.deps import UTCJSONResponse
+from src.schemas.user import UserPublic, user_public_dict
 
-client = TestClient(app)
 
-
-def test_register_and_login_and_me():
+def test_register_and_login_and_me(client):
     # Register
     r = client.post("/auth/register", params={"email": "user1@example.com", "password": "secret123", "username": "u1"})
     assert r.status_code == 200, r.text
@@ -23,3 +22,26 @@ def test_register_and_login_and_me():
     assert r.status_code == 200, r.text
     me = r.json()
     assert me["email"] == "user1@example.com"
+    assert me["created_at"] == data["created_at"]  # same datetime form as the pydantic-encoded register reply
+
+    # Unchanged user: conditional request is answered with an empty 304
+    r = client.get("/auth/me", headers={"Authorization": f"Bearer {token}", "If-None-Match": r.headers["ETag"]})
+    assert r.status_code == 304
+    assert r.content == b""
+
+
+def test_utc_datetimes_encode_like_pydantic():
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    user = UserPublic(
+        id=1, email="a@example.com", username=None, is_active=True, created_at=created_at, updated_at=created_at
+    )
+    assert UTCJSONResponse(user_public_dict(user)).body == user.model_dump_json().encode()
+
+
+def test_json_body_models_are_named_openapi_components(client):
+    schema = client.get("/openapi.json").json()
+    components = schema["components"]["schemas"]
+    for path, model in (("/auth/login", "LoginRequest"), ("/recipes", "RecipeCreate")):
+        body = schema["paths"][path]["post"]["requestBody"]["content"]["application/json"]["schema"]
+        assert body == {"$ref": f"#/components/schemas/{model}"}
+        assert model in components
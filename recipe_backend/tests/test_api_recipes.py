@@ -1,20 +1,12 @@
-from fastapi.testclient import TestClient
+import base64
+import struct
 
-from src.api.main import app
+from sqlalchemy import event
 
-client = TestClient(app)
+from src.db import engine
 
 
-def auth_token(email="chef@example.com", password="cook12345"):
-    client.post("/auth/register", params={"email": email, "password": password, "username": "chef"})
-    r = client.post("/auth/login", json={"email": email, "password": password})
-    assert r.status_code == 200, r.text
-    return r.json()["access_token"]
-
-
-def test_create_list_search_and_rate():
-    token = auth_token()
-
+def test_create_list_search_and_rate(client, auth_headers):
     # Create recipes
     body = {
         "title": "Pasta Primavera",
@@ -24,7 +16,7 @@ def test_create_list_search_and_rate():
         "tags": ["italian", "vegetarian"],
         "metadata": {"cuisine": "Italian", "difficulty": "easy", "time": 25},
     }
-    r = client.post("/recipes", json=body, headers={"Authorization": f"Bearer {token}"})
+    r = client.post("/recipes", json=body, headers=auth_headers)
     assert r.status_code == 200, r.text
     created = r.json()
     recipe_id = created["id"]
@@ -34,9 +26,150 @@ def test_create_list_search_and_rate():
     assert r.status_code == 200, r.text
     items = r.json()
     assert any(it["id"] == recipe_id for it in items)
+    assert int(r.headers["X-Total-Count"]) >= len(items)
+    r = client.get(
+        "/recipes", params={"search": "pasta", "sort": "newest"}, headers={"If-None-Match": r.headers["ETag"]}
+    )
+    assert r.status_code == 304
 
     # Rate
-    r = client.post(f"/recipes/{recipe_id}/rate", json={"rating": 5}, headers={"Authorization": f"Bearer {token}"})
+    r = client.post(f"/recipes/{recipe_id}/rate", json={"rating": 5}, headers=auth_headers)
     assert r.status_code == 200, r.text
     rated = r.json()
     assert rated["avg_rating"] >= 5.0 - 1e-6
+
+
+def test_keyset_pagination_with_cursor(client, auth_headers):
+    created = []
+    for i in range(3):
+        r = client.post("/recipes", json={"title": f"Cursor dish {i}", "tags": ["cursor-test"]}, headers=auth_headers)
+        assert r.status_code == 200, r.text
+        created.append(r.json()["id"])
+
+    seen = []
+    params = {"tags": ["cursor-test"], "sort": "oldest", "page_size": 2}
+    while True:
+        r = client.get("/recipes", params=params)
+        assert r.status_code == 200, r.text
+        seen.extend(it["id"] for it in r.json())
+        next_cursor = r.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        # Opaque and URL-safe: usable in a query string without percent-encoding
+        assert next_cursor.replace("-", "").replace("_", "").isalnum()
+        params["cursor"] = next_cursor
+
+    assert len(seen) == len(set(seen))
+    assert set(created) <= set(seen)
+
+    r = client.get("/recipes", params={"cursor": "not a cursor"})
+    assert r.status_code == 400
+    # Decodes fine but the timestamp is out of datetime's range, in either direction
+    for epoch_us in (2**62, -(2**62)):
+        out_of_range = base64.urlsafe_b64encode(struct.pack(">qq", epoch_us, 1)).rstrip(b"=").decode()
+        r = client.get("/recipes", params={"cursor": out_of_range})
+        assert r.status_code == 400
+
+
+def test_full_text_search_follows_edits(client, auth_headers):
+    body = {"title": "Smoky Shakshuka", "ingredients": ["eggs", "jalapeño"], "tags": ["brunch"]}
+    r = client.post("/recipes", json=body, headers=auth_headers)
+    assert r.status_code == 200, r.text
+    recipe_id = r.json()["id"]
+
+    def search_ids(term):
+        r = client.get("/recipes", params={"search": term})
+        assert r.status_code == 200, r.text
+        return {it["id"] for it in r.json()}
+
+    # Words from any indexed field, matched as prefixes, all required
+    assert recipe_id in search_ids("jalapeño shak")
+    assert recipe_id not in search_ids("jalapeño pasta")
+
+    r = client.put(f"/recipes/{recipe_id}", json={"title": "Green Shakshuka"}, headers=auth_headers)
+    assert r.status_code == 200, r.text
+    assert recipe_id in search_ids("green")
+    assert recipe_id not in search_ids("smoky")
+    # Fields the edit left alone stay searchable
+    assert recipe_id in search_ids("brunch eggs")
+
+    r = client.delete(f"/recipes/{recipe_id}", headers=auth_headers)
+    assert r.status_code == 204, r.text
+    assert recipe_id not in search_ids("shakshuka")
+
+
+def test_rerating_replaces_previous_rating(client, auth_headers):
+    r = client.post("/recipes", json={"title": "Lentil Soup"}, headers=auth_headers)
+    assert r.status_code == 200, r.text
+    recipe_id = r.json()["id"]
+
+    client.post("/auth/register", params={"email": "taster@example.com", "password": "taste12345"})
+    r = client.post("/auth/login", json={"email": "taster@example.com", "password": "taste12345"})
+    taster_headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    for headers, score, expected in ((auth_headers, 5, 5.0), (auth_headers, 3, 3.0), (taster_headers, 4, 3.5)):
+        r = client.post(f"/recipes/{recipe_id}/rate", json={"rating": score}, headers=headers)
+        assert r.status_code == 200, r.text
+        assert abs(r.json()["avg_rating"] - expected) < 1e-6
+
+    r = client.post("/recipes/999999/rate", json={"rating": 5}, headers=auth_headers)
+    assert r.status_code == 404, r.text
+
+
+def test_metadata_filters(client, auth_headers):
+    recipes = {
+        "quick": {"cuisine": "Thai", "difficulty": "easy", "time": 10},
+        "medium": {"cuisine": "Thai", "difficulty": "hard", "time": 45},
+        "slow": {"cuisine": "French", "difficulty": "hard", "time": 120},
+        "untimed": {"cuisine": "French", "difficulty": "easy"},
+    }
+    ids = {}
+    for name, metadata in recipes.items():
+        body = {"title": f"Filter {name}", "tags": ["filter-test"], "metadata": metadata}
+        r = client.post("/recipes", json=body, headers=auth_headers)
+        assert r.status_code == 200, r.text
+        ids[r.json()["id"]] = name
+
+    def names(**params):
+        r = client.get("/recipes", params={"tags": ["filter-test"], **params})
+        assert r.status_code == 200, r.text
+        return {ids[it["id"]] for it in r.json()}
+
+    assert names(min_time=45) == {"medium", "slow"}
+    assert names(max_time=45) == {"quick", "medium"}
+    assert names(min_time=11, max_time=119) == {"medium"}
+    assert names(cuisine="Thai") == {"quick", "medium"}
+    assert names(difficulty="easy") == {"quick", "untimed"}
+    assert names(cuisine="French", difficulty="hard") == {"slow"}
+
+
+def test_write_responses_embed_the_author_without_loading_users(client, auth_headers):
+    # Warm-up request: the caller's own user row is loaded (and cached) by authentication
+    r = client.post("/recipes", json={"title": "Author warm-up"}, headers=auth_headers)
+    assert r.status_code == 200, r.text
+    author = r.json()["owner"]
+    assert author["username"] == "chef"
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        r = client.post("/recipes", json={"title": "Author check"}, headers=auth_headers)
+        assert r.status_code == 200, r.text
+        assert r.json()["owner"] == author
+        recipe_id = r.json()["id"]
+        r = client.put(f"/recipes/{recipe_id}", json={"title": "Author check, edited"}, headers=auth_headers)
+        assert r.status_code == 200, r.text
+        assert r.json()["owner"] == author
+        r = client.post(f"/recipes/{recipe_id}/rate", json={"rating": 4}, headers=auth_headers)
+        assert r.status_code == 200, r.text
+        assert r.json()["owner"] == author
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    # Only rating looks the author up, and then only for the embedded columns
+    user_reads = [statement for statement in statements if "FROM users" in statement]
+    assert len(user_reads) == 1
+    assert "users.password_hash" not in user_reads[0]
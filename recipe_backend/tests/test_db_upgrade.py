@@ -0,0 +1,63 @@
+from sqlalchemy import create_engine, event, inspect, text
+
+from src.db import bootstrap_schema, engine, upgrade_schema
+from src.db.models import email_lookup_hash
+
+# Tables as created by the first release, before any columns were added to them
+LEGACY_SCHEMA = (
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(255) NOT NULL UNIQUE, username VARCHAR(50),"
+    " password_hash VARCHAR(255) NOT NULL, is_active BOOLEAN NOT NULL,"
+    " created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL, updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL)",
+    "CREATE TABLE recipes (id INTEGER PRIMARY KEY, owner_id INTEGER REFERENCES users(id), title VARCHAR(255) NOT NULL,"
+    " description TEXT, ingredients JSON, steps JSON, tags JSON, recipe_metadata JSON, avg_rating FLOAT,"
+    " created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL, updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL)",
+    "CREATE TABLE recipe_ratings (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users(id),"
+    " recipe_id INTEGER REFERENCES recipes(id), rating INTEGER NOT NULL, comment TEXT,"
+    " created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL, updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,"
+    " UNIQUE (user_id, recipe_id))",
+    "INSERT INTO users (id, email, password_hash, is_active) VALUES (1, 'Old@Example.com', 'x', 1), (2, 'b@e.com', 'x', 1)",
+    "INSERT INTO recipes (id, owner_id, title, ingredients, tags, recipe_metadata) VALUES"
+    " (1, 1, 'Tomato Soup', '[\"tomatoes\", \"basil\"]', '[\"soup\"]', '{\"time\": 30}')",
+    "INSERT INTO recipe_ratings (user_id, recipe_id, rating) VALUES (1, 1, 4), (2, 1, 5)",
+)
+
+
+def test_upgrade_schema_backfills_legacy_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+
+    upgrade_schema(engine)
+    upgrade_schema(engine)  # idempotent
+
+    with engine.connect() as conn:
+        user = conn.execute(text("SELECT email_hash FROM users WHERE id = 1")).one()
+        recipe = conn.execute(
+            text("SELECT title_lower, prep_time_minutes, sum_rating, num_ratings FROM recipes WHERE id = 1")
+        ).one()
+        found = conn.execute(text("SELECT rowid FROM recipes_fts WHERE recipes_fts MATCH 'basil'")).scalars().all()
+    assert user.email_hash == email_lookup_hash("old@example.com")
+    assert tuple(recipe) == ("tomato soup", 30, 9, 2)
+    assert found == [1]
+    assert "ix_users_email_hash" in {ix["name"] for ix in inspect(engine).get_indexes("users")}
+
+
+def test_bootstrap_schema_skips_an_up_to_date_database(client):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert bootstrap_schema() is False  # the app lifespan already bootstrapped this database
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert len(statements) <= 2
+    assert not any(statement.lstrip().upper().startswith(("CREATE", "ALTER")) for statement in statements)
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM schema_state"))
+    assert bootstrap_schema() is True
+    assert bootstrap_schema() is False
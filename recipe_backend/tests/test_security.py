@@ -0,0 +1,75 @@
+import base64
+import json
+import time
+
+import pytest
+from jose import jwt
+
+from src.core.config import get_settings
+from src.core.security import decode_access_token, decode_access_token_claims
+
+SECRET = get_settings().SECRET_KEY
+
+
+def _segment(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+
+def test_valid_token_returns_claims():
+    token = jwt.encode({"sub": "42", "exp": int(time.time()) + 60, "scope": "read"}, SECRET, algorithm="HS256")
+    claims = decode_access_token_claims(token)
+    assert claims is not None
+    assert claims["sub"] == "42"
+    assert claims["scope"] == "read"
+    assert decode_access_token(token) == "42"
+
+
+def test_token_without_exp_is_accepted():
+    token = jwt.encode({"sub": "7"}, SECRET, algorithm="HS256")
+    assert decode_access_token_claims(token) == {"sub": "7"}
+
+
+def test_expired_token_is_rejected():
+    token = jwt.encode({"sub": "42", "exp": int(time.time()) - 1}, SECRET, algorithm="HS256")
+    assert decode_access_token_claims(token) is None
+
+
+def test_tampered_payload_is_rejected():
+    token = jwt.encode({"sub": "42", "exp": int(time.time()) + 60}, SECRET, algorithm="HS256")
+    header, _, signature = token.split(".")
+    forged = _segment({"sub": "1", "exp": int(time.time()) + 60})
+    assert decode_access_token_claims(f"{header}.{forged}.{signature}") is None
+
+
+def test_token_signed_with_another_key_is_rejected():
+    token = jwt.encode({"sub": "42", "exp": int(time.time()) + 60}, SECRET + "-other", algorithm="HS256")
+    assert decode_access_token_claims(token) is None
+
+
+def test_other_algorithms_are_rejected():
+    token = jwt.encode({"sub": "42", "exp": int(time.time()) + 60}, SECRET, algorithm="HS384")
+    assert decode_access_token_claims(token) is None
+
+
+def test_unsigned_alg_none_token_is_rejected():
+    payload = _segment({"sub": "42", "exp": int(time.time()) + 60})
+    for alg in ("none", "None"):
+        token = f"{_segment({'alg': alg, 'typ': 'JWT'})}.{payload}."
+        assert decode_access_token_claims(token) is None
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "not-a-token",
+        "a.b",
+        "a.b.c",
+        "a.b.c.d",
+        "!!!.???.***",
+        "é.é.é",
+        f"{_segment({'alg': 'HS256'})}.{base64.urlsafe_b64encode(b'[1, 2]').decode()}.sig",
+    ],
+)
+def test_malformed_tokens_are_rejected(token):
+    assert decode_access_token_claims(token) is None